@@ -12,6 +12,7 @@ from homeassistant.core import HomeAssistant
 
 from . import api
 from . import coordinator
+from . import profiling
 from .const import *
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
@@ -37,6 +38,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     await _coordinator.async_config_entry_first_refresh()
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    profiling.async_register_services(hass)
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
@@ -46,6 +48,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Handle removal of an entry."""
     if unloaded := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        profiling.async_unregister_services(hass)
     return unloaded
 
 
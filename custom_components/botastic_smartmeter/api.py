@@ -20,6 +20,7 @@ DEFAULT_STOPBITS = serial_asyncio.serial.STOPBITS_ONE
 DEFAULT_XONXOFF = False
 DEFAULT_RTSCTS = False
 DEFAULT_DSRDTR = False
+DEFAULT_READ_SIZE = 1024
 SIM_DATA = "68FAFA6853FF000167DB084B464D675000000981F8200000002388D5AB4F97515AAFC6B88D2F85DAA7A0E3C0C40D004535C397C9D037AB7DBDA329107615444894A1A0DD7E85F02D496CECD3FF46AF5FB3C9229CFE8F3EE4606AB2E1F409F36AAD2E50900A4396FC6C2E083F373233A69616950758BFC7D63A9E9B6E99E21B2CBC2B934772CA51FD4D69830711CAB1F8CFF25F0A329337CBA51904F0CAED88D61968743C8454BA922EB00038182C22FE316D16F2A9F544D6F75D51A4E92A1C4EF8AB19A2B7FEAA32D0726C0ED80229AE6C0F7621A4209251ACE2B2BC66FF0327A653BB686C756BE033C7A281F1D2A7E1FA31C3983E15F8FD16CC5787E6F517166814146853FF110167419A3CFDA44BE438C96F0E38BF83D98316"  # pylint: disable=line-too-long
 
 
@@ -48,6 +49,7 @@ class BotasticSmartmeterApi:
         self._reader = None
         self.coordinator = None
         self.data_received = None
+        self.profiler = None
         self.mbus_decode = mbus_decode.MBusDecode(self._mbus_key)
         self.device_info = {
             "serial_number": "123456",
@@ -112,10 +114,7 @@ class BotasticSmartmeterApi:
                 await self._handle_error()
             else:
                 LOGGER.info("Serial device %s connected", device)
-                data_start = False
-                data_nr = 0
-                data_nr_target = (282 + 6) * 2
-                message_buffer = ""
+                frame_parser = mbus_decode.MBusFrameParser()
 
                 # energy_import_test = 21060.1
 
@@ -134,8 +133,8 @@ class BotasticSmartmeterApi:
 
                     try:
                         async with timeout(2.5):
-                            res = await self._reader.read(data_nr_target)
-                            in_hex = res.decode("utf-8")
+                            res = await self._reader.read(DEFAULT_READ_SIZE)
+                            in_hex = res.decode("ascii", errors="ignore")
                     except asyncio.TimeoutError:
                         await asyncio.sleep(0.1)
                     except asyncio.exceptions.CancelledError:
@@ -153,26 +152,38 @@ class BotasticSmartmeterApi:
                     else:
                         # LOGGER.debug("read result: %s", in_hex)
                         if in_hex is not None and len(in_hex) > 0:
-                            if not data_start:
-                                if in_hex[0:4] == "68FA":
-                                    data_start = True
-                                    data_nr = 0
-                                    message_buffer = ""
-                            if data_start:
-                                data_nr += len(in_hex)
-                                message_buffer += in_hex
-                                if data_nr >= data_nr_target:
-                                    data_start = False
+                            # Only set while the profile service is running
+                            profiler = self.profiler
+                            if profiler is not None:
+                                try:
+                                    profiler.enable()
+                                except ValueError as err:
+                                    # Another profiler started in the meantime
+                                    LOGGER.warning("Profiling stopped: %s", err)
+                                    self.profiler = profiler = None
+                            try:
+                                try:
+                                    apdus = frame_parser.feed(in_hex)
+                                except Exception as err:  # pylint: disable=broad-except
+                                    LOGGER.warning("Error Parse: %s", format(err))
+                                    frame_parser = mbus_decode.MBusFrameParser()
+                                    apdus = []
+                                for apdu in apdus:
                                     # Decode and Print the contents of the serial data
-                                    self.data_received = (
-                                        self.mbus_decode.message_decode(
-                                            message_buffer, False
+                                    try:
+                                        self.data_received = (
+                                            self.mbus_decode.dlms_decode(apdu, False)
                                         )
-                                    )
+                                    except Exception as err:  # pylint: disable=broad-except
+                                        LOGGER.warning("Error Decode: %s", format(err))
+                                        continue
                                     if self.data_received is not None:
-                                        self.coordinator.async_set_updated_data(
+                                        self.coordinator.async_set_updated_values(
                                             self.data_received
                                         )
+                            finally:
+                                if profiler is not None:
+                                    profiler.disable()
                         else:
                             await asyncio.sleep(0.1)
 
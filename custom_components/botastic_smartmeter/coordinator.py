@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
+from typing import Any
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
@@ -26,6 +29,7 @@ class BotasticSmartmeterDataUpdateCoordinator(DataUpdateCoordinator):
     ) -> None:
         """Initialize."""
         self._api = _api
+        self._value_listeners: dict[str, list[Callable[[Any], None]]] = {}
         super().__init__(
             hass=hass,
             logger=LOGGER,
@@ -39,3 +43,34 @@ class BotasticSmartmeterDataUpdateCoordinator(DataUpdateCoordinator):
             return await self._api.async_get_data()
         except api.BotasticSmartmeterApiError as exception:
             raise UpdateFailed(exception) from exception
+
+    @callback
+    def async_add_value_listener(
+        self, key: str, update_callback: Callable[[Any], None]
+    ) -> CALLBACK_TYPE:
+        """Listen for changes of a single decoded value."""
+        listeners = self._value_listeners.setdefault(key, [])
+        listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove update listener."""
+            listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_set_updated_values(self, values: dict[str, Any]) -> None:
+        """Store the values of a frame and push the changed ones to their listeners."""
+        data = self.data
+        if data is None or not self.last_update_success:
+            # Nothing to compare against, wake up all entities once
+            self.async_set_updated_data(dict(values))
+            return
+
+        for key, value in values.items():
+            if data.get(key) == value:
+                continue
+            data[key] = value
+            for update_callback in self._value_listeners.get(key, ()):
+                update_callback(value)
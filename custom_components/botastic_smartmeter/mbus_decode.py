@@ -1,5 +1,6 @@
 """MBUS decode unit for Botastic Smartmeter."""
 
+import re
 import xml.etree.ElementTree as ET
 
 from datetime import datetime
@@ -10,6 +11,114 @@ from Cryptodome.Cipher import AES
 from . import sensor
 from .const import LOGGER
 
+# M-Bus long frame: 68 L L 68 C A CI ... CS 16
+MBUS_START = "68"
+MBUS_STOP = 0x16
+MBUS_HEADER_LEN = 4
+MBUS_TRAILER_LEN = 2
+# CI 0x00-0x1F: DLMS segment, bit 4 marks the last segment
+MBUS_CI_DLMS_MAX = 0x1F
+MBUS_CI_FINAL = 0x10
+MBUS_CI_SEQUENCE = 0x0F
+# C, A, CI, STSAP and DTSAP before the segment data
+MBUS_TRANSPORT_HEADER_LEN = 5
+
+DLMS_DATA_NOTIFICATION = 0x0F
+DLMS_GENERAL_GLO_CIPHERING = 0xDB
+DLMS_GENERAL_DED_CIPHERING = 0xDC
+DLMS_SC_AUTHENTICATION = 0x10
+DLMS_SC_ENCRYPTION = 0x20
+DLMS_AUTH_TAG_LEN = 12
+
+NON_HEX = re.compile("[^0-9A-Fa-f]")
+
+
+class MBusFrameParser:
+    """Reassemble DLMS apdus from a stream of hex encoded M-Bus long frames."""
+
+    def __init__(self):
+        """Initialize the frame parser."""
+        self._buffer = ""
+        self._segments = []
+        self._next_sequence = 0
+
+    def feed(self, data):
+        """Add received hex text and return the completed apdus."""
+        buffer = self._buffer + NON_HEX.sub("", data)
+        apdus = []
+        pos = 0
+        while True:
+            start = buffer.find(MBUS_START, pos)
+            if start < 0:
+                # Keep a trailing "6" which may be the start of the next frame
+                pos = max(pos, len(buffer) - 1)
+                break
+            header = buffer[start : start + MBUS_HEADER_LEN * 2]
+            if len(header) < MBUS_HEADER_LEN * 2:
+                pos = start
+                break
+            if header[2:4] != header[4:6] or header[6:8] != MBUS_START:
+                pos = start + 1
+                continue
+            length = int(header[2:4], 16)
+            end = start + (MBUS_HEADER_LEN + length + MBUS_TRAILER_LEN) * 2
+            if len(buffer) < end:
+                pos = start
+                break
+            frame = bytes.fromhex(buffer[start:end])
+            body = frame[MBUS_HEADER_LEN:-MBUS_TRAILER_LEN]
+            if frame[-1] != MBUS_STOP or sum(body) & 0xFF != frame[-2]:
+                # Not a frame or a truncated one, resync on the next start byte
+                pos = start + 1
+                continue
+            pos = end
+            if length < MBUS_TRANSPORT_HEADER_LEN:
+                LOGGER.debug("Ignoring M-Bus frame of %d bytes", length)
+                continue
+            apdu = self._add_segment(body)
+            if apdu is not None:
+                apdus.append(apdu)
+        self._buffer = buffer[pos:]
+        return apdus
+
+    def _add_segment(self, body):
+        """Add the data of a frame and return the apdu once complete."""
+        if len(body) < MBUS_TRANSPORT_HEADER_LEN:
+            LOGGER.debug("Ignoring M-Bus frame of %d bytes", len(body))
+            return None
+        if body[2] > MBUS_CI_DLMS_MAX:
+            LOGGER.debug("Ignoring M-Bus frame with CI field %02X", body[2])
+            return None
+        sequence = body[2] & MBUS_CI_SEQUENCE
+        if sequence == 0:
+            self._segments = []
+        elif sequence != self._next_sequence or not self._segments:
+            LOGGER.debug("Dropping M-Bus segment %d out of sequence", sequence)
+            self._segments = []
+            self._next_sequence = 0
+            return None
+        self._segments.append(body[MBUS_TRANSPORT_HEADER_LEN:])
+        self._next_sequence = (sequence + 1) & MBUS_CI_SEQUENCE
+        if not body[2] & MBUS_CI_FINAL:
+            return None
+        apdu = b"".join(self._segments)
+        self._segments = []
+        self._next_sequence = 0
+        return apdu
+
+
+def _axdr_length(data, pos):
+    """Return the A-XDR encoded length at pos and the position after it."""
+    if pos >= len(data):
+        return None, pos
+    length = data[pos]
+    if length < 0x80:
+        return length, pos + 1
+    size = length & 0x7F
+    if pos + 1 + size > len(data):
+        return None, pos
+    return int.from_bytes(data[pos + 1 : pos + 1 + size], "big"), pos + 1 + size
+
 
 class MBusDecode:
     """Representation of the mbus decode unit"""
@@ -17,6 +126,7 @@ class MBusDecode:
     def __init__(self, mbus_key):
         """Initialize the mbus decode unit."""
         self._mbus_key = mbus_key
+        self._encryption_key = unhexlify(mbus_key)
         self.tr = GXDLMSTranslator()
         # Values in XML File
         self.octet_string_values = {}
@@ -25,18 +135,45 @@ class MBusDecode:
             self.octet_string_values[entity.octet] = entity.key
             self.conversion_factor[entity.key] = entity.conversion_factor
 
-    def evn_decrypt(self, frame, key, system_title, frame_counter):
-        """encrypt the frame"""
-        frame = unhexlify(frame)
-        encryption_key = unhexlify(key)
-        init_vector = unhexlify(system_title + frame_counter)
-        cipher = AES.new(encryption_key, AES.MODE_GCM, nonce=init_vector)
-        return cipher.decrypt(frame).hex()
+    def dlms_decrypt(self, apdu, print_out=False):
+        """Decrypt a ciphered apdu by its security header."""
+        if apdu[0] not in (DLMS_GENERAL_GLO_CIPHERING, DLMS_GENERAL_DED_CIPHERING):
+            LOGGER.warning("Unsupported apdu tag: %02X", apdu[0])
+            return None
+        if len(apdu) < 2 or len(apdu) < 3 + apdu[1]:
+            LOGGER.warning("Truncated apdu header: %d bytes", len(apdu))
+            return None
+        title_len = apdu[1]
+        system_title = apdu[2 : 2 + title_len]
+        length, pos = _axdr_length(apdu, 2 + title_len)
+        if length is None:
+            LOGGER.warning("Truncated apdu header: %d bytes", len(apdu))
+            return None
+        if pos + length > len(apdu) or length < 5:
+            LOGGER.warning(
+                "Truncated apdu: %d of %d bytes", max(len(apdu) - pos, 0), length
+            )
+            return None
+        security_control = apdu[pos]
+        frame_counter = apdu[pos + 1 : pos + 5]
+        ciphertext = apdu[pos + 5 : pos + length]
+        if security_control & DLMS_SC_AUTHENTICATION:
+            ciphertext = ciphertext[:-DLMS_AUTH_TAG_LEN]
+        if print_out:
+            LOGGER.info("system_title: %s", system_title.hex())
+            LOGGER.info("security_control: %02X", security_control)
+            LOGGER.info("frame_counter: %s", frame_counter.hex())
+        if not security_control & DLMS_SC_ENCRYPTION:
+            return ciphertext
+        cipher = AES.new(
+            self._encryption_key, AES.MODE_GCM, nonce=system_title + frame_counter
+        )
+        return cipher.decrypt(ciphertext)
 
     def apdu_decode(self, apdu, print_out=False):
         """decode the apdu"""
-        if apdu[0:4] != "0f80":
-            LOGGER.exception("Error apdu header: %s", apdu[0:4])
+        if apdu[0:2] != f"{DLMS_DATA_NOTIFICATION:02x}":
+            LOGGER.warning("Error apdu header: %s (wrong MBUS key?)", apdu[0:4])
             return
         try:
             xml = self.tr.pduToXml(
@@ -87,21 +224,22 @@ class MBusDecode:
             )
         return data_received
 
+    def dlms_decode(self, apdu, print_out=False):
+        """Decode a reassembled DLMS apdu."""
+        if apdu and apdu[0] != DLMS_DATA_NOTIFICATION:
+            apdu = self.dlms_decrypt(apdu, print_out)
+        if not apdu:
+            return None
+        if print_out:
+            LOGGER.info("apdu: %s", apdu.hex())
+        return self.apdu_decode(apdu.hex(), print_out)
+
     def message_decode(self, msg, print_out=False):
         """Decode hex message from mbus."""
-        mbusstart = msg[0:8]
-        frame_len = int("0x" + mbusstart[2:4], 16)
-        system_title = msg[22:38]
-        frame_counter = msg[44:52]
-        frame = msg[52 : 8 + frame_len * 2]
-        apdu = self.evn_decrypt(frame, self._mbus_key, system_title, frame_counter)
         if print_out:
             LOGGER.info("Decode: ")
-            LOGGER.info("mbusstart: %s", mbusstart)
-            LOGGER.info("frame_len: %s", str(frame_len))
-            LOGGER.info("system_title: %s", system_title)
-            LOGGER.info("frame_counter: %s", frame_counter)
             LOGGER.info("msg: %s", msg)
-            LOGGER.info("key: %s", self._mbus_key)
-            LOGGER.info("apdu: %s", apdu)
-        return self.apdu_decode(apdu, print_out)
+        data_received = None
+        for apdu in MBusFrameParser().feed(msg):
+            data_received = self.dlms_decode(apdu, print_out)
+        return data_received
@@ -0,0 +1,130 @@
+"""Profile service for Botastic Smartmeter."""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import pstats
+import tracemalloc
+from datetime import datetime
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DOMAIN, LOGGER
+
+SERVICE_PROFILE = "profile"
+PROFILING_DATA = f"{DOMAIN}_profiling"
+CONF_DURATION = "duration"
+DEFAULT_DURATION = 60
+TRACEMALLOC_FRAMES = 10
+TOP_STATS = 50
+
+SERVICE_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_DURATION, default=DEFAULT_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+    }
+)
+
+
+def async_register_services(hass: HomeAssistant) -> None:
+    """Register the profile service."""
+    if hass.services.has_service(DOMAIN, SERVICE_PROFILE):
+        return
+
+    async def _async_profile(call: ServiceCall) -> None:
+        await async_profile(hass, call.data[CONF_DURATION])
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, _async_profile, schema=SERVICE_PROFILE_SCHEMA
+    )
+
+
+def async_unregister_services(hass: HomeAssistant) -> None:
+    """Remove the profile service when the last entry is unloaded."""
+    if not hass.data.get(DOMAIN):
+        hass.services.async_remove(DOMAIN, SERVICE_PROFILE)
+
+
+async def async_profile(hass: HomeAssistant, duration: float) -> None:
+    """Profile the read/decode path of all meters for the given duration."""
+    apis = [_coordinator._api for _coordinator in hass.data.get(DOMAIN, {}).values()]
+    if not apis:
+        raise HomeAssistantError("No smartmeter configured")
+    if hass.data.get(PROFILING_DATA):
+        raise HomeAssistantError("Profiling is already running")
+
+    profiler = cProfile.Profile()
+    try:
+        # Fail here instead of in the read loop if another profiler is active
+        profiler.enable()
+        profiler.disable()
+    except ValueError as err:
+        raise HomeAssistantError(f"Unable to start profiler: {err}") from err
+
+    # Claim the slot before the first await, overlapping calls are rejected
+    hass.data[PROFILING_DATA] = True
+    try:
+        started_tracemalloc = not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        LOGGER.info("Profiling smartmeter read loop for %s seconds", duration)
+        try:
+            snapshot_start = await hass.async_add_executor_job(
+                tracemalloc.take_snapshot
+            )
+            for _api in apis:
+                _api.profiler = profiler
+            try:
+                await asyncio.sleep(duration)
+            finally:
+                for _api in apis:
+                    _api.profiler = None
+            snapshot_end = await hass.async_add_executor_job(tracemalloc.take_snapshot)
+        finally:
+            if started_tracemalloc:
+                tracemalloc.stop()
+
+        path = hass.config.path(
+            f"{DOMAIN}_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        )
+        await hass.async_add_executor_job(
+            _write_results, path, duration, profiler, snapshot_start, snapshot_end
+        )
+        LOGGER.info("Profile written to %s", path)
+    finally:
+        hass.data.pop(PROFILING_DATA, None)
+
+
+def _write_results(
+    path: str,
+    duration: float,
+    profiler: cProfile.Profile,
+    snapshot_start: tracemalloc.Snapshot,
+    snapshot_end: tracemalloc.Snapshot,
+) -> None:
+    """Write the profiler statistics and the memory diff to a file."""
+    out = io.StringIO()
+    out.write(f"Botastic Smartmeter profile over {duration} seconds\n\n")
+    stats = pstats.Stats(profiler, stream=out)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_STATS)
+    profiler.dump_stats(path.removesuffix(".txt") + ".cprof")
+
+    out.write("\nMemory allocation diff (tracemalloc)\n\n")
+    snapshot_filter = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    )
+    diff = snapshot_end.filter_traces(snapshot_filter).compare_to(
+        snapshot_start.filter_traces(snapshot_filter), "lineno"
+    )
+    for stat in diff[:TOP_STATS]:
+        out.write(f"{stat}\n")
+
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(out.getvalue())
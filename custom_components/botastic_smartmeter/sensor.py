@@ -16,6 +16,8 @@ from homeassistant.const import (
     UnitOfPower,
 )
 
+from homeassistant.core import callback
+
 from . import coordinator, entity
 from .const import DOMAIN, LOGGER
 
@@ -147,13 +149,34 @@ class BotasticSmartmeterSensor(entity.BotasticSmartmeterEntity, SensorEntity):
         super().__init__(_coordinator, entity_description)
         self.entity_description = entity_description
         LOGGER.debug("Added entity %s", self.entity_description.key)
+        self._attr_native_value = self._value_from_data()
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the value of this sensor only."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_value_listener(
+                self.entity_description.key, self._handle_value_update
+            )
+        )
 
-    @property
-    def native_value(self) -> str:
-        """Return the native value of the sensor."""
+    def _value_from_data(self) -> str:
+        """Return the value of the sensor from the coordinator data."""
         values = self.coordinator.data
         if values is None:
             value = "0"
         else:
-            value = values.get(self.translation_key)
+            value = values.get(self.entity_description.key)
         return value
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle a full data update from the coordinator."""
+        self._attr_native_value = self._value_from_data()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _handle_value_update(self, value) -> None:
+        """Handle a changed value pushed by the coordinator."""
+        self._attr_native_value = value
+        self.async_write_ha_state()
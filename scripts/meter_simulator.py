@@ -0,0 +1,359 @@
+"""Deterministic smartmeter simulator for Botastic Smartmeter.
+
+Generates AES-GCM encrypted DLMS data notifications wrapped in M-Bus long
+frames, the same way the meter pushes them through the bridge, and writes
+them as hex text to a pseudo-terminal. Point the integration at the printed
+pty path (or at the ``--link`` symlink) to exercise the read loop.
+
+The output only depends on ``--seed``, so a soak run can be reproduced frame
+by frame. ``--speedup`` shortens the push interval for load tests.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import random
+import struct
+import sys
+import time
+import tty
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from Cryptodome.Cipher import AES
+
+LOGGER = logging.getLogger("meter_simulator")
+
+DEFAULT_MBUS_KEY = "0123456789ABCDEF0123456789ABCDEF"
+DEFAULT_SYSTEM_TITLE = "4B464D6750000009"
+DEFAULT_INTERVAL = 5.0
+DEFAULT_START = datetime(2024, 1, 1)
+
+# M-Bus long frame constants as sent by the meter
+MBUS_START = 0x68
+MBUS_STOP = 0x16
+MBUS_CONTROL = 0x53
+MBUS_ADDRESS = 0xFF
+MBUS_CI_FINAL = 0x10
+MBUS_STSAP = 0x01
+MBUS_DTSAP = 0x67
+MBUS_MAX_LENGTH = 0xFA
+MBUS_SEGMENT_DATA = MBUS_MAX_LENGTH - 5
+
+# DLMS constants
+TAG_GENERAL_GLO_CIPHERING = 0xDB
+TAG_DATA_NOTIFICATION = 0x0F
+SECURITY_CONTROL = 0x20
+TYPE_STRUCTURE = 0x02
+TYPE_DOUBLE_LONG_UNSIGNED = 0x06
+TYPE_OCTET_STRING = 0x09
+TYPE_LONG_UNSIGNED = 0x12
+TYPE_INTEGER = 0x0F
+TYPE_ENUM = 0x16
+OBIS_LOGICAL_DEVICE_NAME = "00002A0000FF"
+
+# OBIS codes in the order the meter sends them, see sensor.ENTITY_DESCRIPTIONS.
+# Each value is followed by its scaler and unit like on the real meter.
+OBIS_VALUES = (
+    ("0100200700FF", "voltage_1", TYPE_LONG_UNSIGNED, -1, 0x23),
+    ("01001F0700FF", "current_1", TYPE_LONG_UNSIGNED, -2, 0x21),
+    ("0100340700FF", "voltage_2", TYPE_LONG_UNSIGNED, -1, 0x23),
+    ("0100330700FF", "current_2", TYPE_LONG_UNSIGNED, -2, 0x21),
+    ("0100480700FF", "voltage_3", TYPE_LONG_UNSIGNED, -1, 0x23),
+    ("0100470700FF", "current_3", TYPE_LONG_UNSIGNED, -2, 0x21),
+    ("0100010700FF", "power_import", TYPE_DOUBLE_LONG_UNSIGNED, 0, 0x1B),
+    ("0100020700FF", "power_export", TYPE_DOUBLE_LONG_UNSIGNED, 0, 0x1B),
+    ("0100010800FF", "energy_import", TYPE_DOUBLE_LONG_UNSIGNED, 0, 0x1E),
+    ("0100020800FF", "energy_export", TYPE_DOUBLE_LONG_UNSIGNED, 0, 0x1E),
+    ("01000D0700FF", "power_factor", TYPE_LONG_UNSIGNED, -3, 0xFF),
+)
+
+
+@dataclass
+class Faults:
+    """Probabilities (0..1) of the faults injected per telegram."""
+
+    split: float = 0.0
+    garbage: float = 0.0
+    truncate: float = 0.0
+    wrong_key: float = 0.0
+
+
+class MeterState:
+    """Slowly drifting three phase household load."""
+
+    def __init__(self, rng: random.Random, start: datetime) -> None:
+        """Initialize the meter state."""
+        self._rng = rng
+        self.now = start
+        self.voltage = [230.0, 231.0, 229.0]
+        self.current = [1.5, 0.8, 2.1]
+        self.power_factor = 0.95
+        self.production = 0.0
+        self.energy_import = 21060100.0
+        self.energy_export = 3500200.0
+
+    def advance(self, seconds: float) -> None:
+        """Advance the state by the given number of seconds."""
+        rng = self._rng
+        self.now += timedelta(seconds=seconds)
+        for phase in range(3):
+            self.voltage[phase] = min(
+                253.0, max(207.0, self.voltage[phase] + rng.gauss(0, 0.3))
+            )
+            self.current[phase] = min(
+                60.0, max(0.0, self.current[phase] + rng.gauss(0, 0.2))
+            )
+        self.power_factor = min(1.0, max(0.5, self.power_factor + rng.gauss(0, 0.01)))
+        # PV production follows the daylight hours
+        hour = self.now.hour + self.now.minute / 60
+        sun = max(0.0, 1 - abs(hour - 13) / 6)
+        self.production = max(0.0, 4000 * sun + rng.gauss(0, 50))
+        consumption = sum(
+            u * i * self.power_factor for u, i in zip(self.voltage, self.current)
+        )
+        balance = consumption - self.production
+        self.energy_import += max(0.0, balance) * seconds / 3600
+        self.energy_export += max(0.0, -balance) * seconds / 3600
+
+    def values(self) -> dict[str, int]:
+        """Return the raw register values as the meter encodes them."""
+        consumption = sum(
+            u * i * self.power_factor for u, i in zip(self.voltage, self.current)
+        )
+        balance = consumption - self.production
+        return {
+            "voltage_1": round(self.voltage[0] * 10),
+            "current_1": round(self.current[0] * 100),
+            "voltage_2": round(self.voltage[1] * 10),
+            "current_2": round(self.current[1] * 100),
+            "voltage_3": round(self.voltage[2] * 10),
+            "current_3": round(self.current[2] * 100),
+            "power_import": round(max(0.0, balance)),
+            "power_export": round(max(0.0, -balance)),
+            "energy_import": int(self.energy_import),
+            "energy_export": int(self.energy_export),
+            "power_factor": round(self.power_factor * 1000),
+        }
+
+
+def build_apdu(
+    invoke_id: int, now: datetime, system_title: str, values: dict[str, int]
+) -> bytes:
+    """Build the plain DLMS data notification."""
+    apdu = bytearray([TAG_DATA_NOTIFICATION])
+    apdu += struct.pack(">I", 0x80000000 | (invoke_id & 0x7FFFFFFF))
+    apdu += b"\x0c" + struct.pack(
+        ">HBBBBBBBhB",
+        now.year,
+        now.month,
+        now.day,
+        now.isoweekday(),
+        now.hour,
+        now.minute,
+        now.second,
+        0,
+        -0x8000,
+        0,
+    )
+    apdu += bytes([TYPE_STRUCTURE, 2 + len(OBIS_VALUES) * 3])
+    name = system_title.encode()
+    apdu += bytes([TYPE_OCTET_STRING, 6]) + bytes.fromhex(OBIS_LOGICAL_DEVICE_NAME)
+    apdu += bytes([TYPE_OCTET_STRING, len(name)]) + name
+    for obis, key, data_type, scaler, unit in OBIS_VALUES:
+        apdu += bytes([TYPE_OCTET_STRING, 6]) + bytes.fromhex(obis)
+        fmt = ">I" if data_type == TYPE_DOUBLE_LONG_UNSIGNED else ">H"
+        apdu += bytes([data_type]) + struct.pack(fmt, values[key])
+        apdu += bytes([TYPE_STRUCTURE, 2, TYPE_INTEGER, scaler & 0xFF, TYPE_ENUM, unit])
+    return bytes(apdu)
+
+
+def encrypt_apdu(apdu: bytes, key: str, system_title: str, frame_counter: int) -> bytes:
+    """Wrap the apdu in a general-glo-ciphering apdu (encryption only)."""
+    fc = struct.pack(">I", frame_counter)
+    nonce = bytes.fromhex(system_title) + fc
+    cipher = AES.new(bytes.fromhex(key), AES.MODE_GCM, nonce=nonce)
+    payload = bytes([SECURITY_CONTROL]) + fc + cipher.encrypt(apdu)
+    if len(payload) < 0x80:
+        length = bytes([len(payload)])
+    elif len(payload) < 0x100:
+        length = bytes([0x81, len(payload)])
+    else:
+        length = b"\x82" + struct.pack(">H", len(payload))
+    return (
+        bytes([TAG_GENERAL_GLO_CIPHERING, 8])
+        + bytes.fromhex(system_title)
+        + length
+        + payload
+    )
+
+
+def mbus_frames(data: bytes) -> bytes:
+    """Split the data into M-Bus long frame segments."""
+    frames = bytearray()
+    segments = [
+        data[i : i + MBUS_SEGMENT_DATA] for i in range(0, len(data), MBUS_SEGMENT_DATA)
+    ]
+    for seq, segment in enumerate(segments):
+        ci = seq & 0x0F
+        if seq == len(segments) - 1:
+            ci |= MBUS_CI_FINAL
+        body = bytes([MBUS_CONTROL, MBUS_ADDRESS, ci, MBUS_STSAP, MBUS_DTSAP]) + segment
+        frames += bytes([MBUS_START, len(body), len(body), MBUS_START])
+        frames += body + bytes([sum(body) & 0xFF, MBUS_STOP])
+    return bytes(frames)
+
+
+class MeterSimulator:
+    """Deterministic source of encrypted meter telegrams."""
+
+    def __init__(
+        self,
+        mbus_key: str = DEFAULT_MBUS_KEY,
+        system_title: str = DEFAULT_SYSTEM_TITLE,
+        interval: float = DEFAULT_INTERVAL,
+        seed: int = 0,
+        faults: Faults | None = None,
+        start: datetime = DEFAULT_START,
+    ) -> None:
+        """Initialize the simulator."""
+        self._mbus_key = mbus_key
+        self._system_title = system_title
+        self._interval = interval
+        self._rng = random.Random(seed)
+        self._faults = faults or Faults()
+        self.state = MeterState(random.Random(seed + 1), start)
+        self.frame_counter = 0
+
+    def next_telegram(self, mbus_key: str | None = None) -> str:
+        """Advance the meter and return the next telegram as hex text."""
+        self.state.advance(self._interval)
+        self.frame_counter += 1
+        apdu = build_apdu(
+            self.frame_counter,
+            self.state.now,
+            self._system_title,
+            self.state.values(),
+        )
+        data = encrypt_apdu(
+            apdu,
+            mbus_key or self._mbus_key,
+            self._system_title,
+            self.frame_counter,
+        )
+        return mbus_frames(data).hex().upper()
+
+    def chunks(self) -> Iterator[str]:
+        """Return the next telegram as written to the port, faults included."""
+        rng = self._rng
+        faults = self._faults
+        wrong_key = None
+        if rng.random() < faults.wrong_key:
+            wrong_key = "".join(rng.choice("0123456789ABCDEF") for _ in range(32))
+        telegram = self.next_telegram(wrong_key)
+        if rng.random() < faults.truncate:
+            telegram = telegram[: rng.randrange(8, len(telegram))]
+        if rng.random() < faults.garbage:
+            size = rng.randrange(1, 64)
+            yield "".join(rng.choice("0123456789ABCDEF\r\n") for _ in range(size))
+        if rng.random() < faults.split:
+            pos = 0
+            while pos < len(telegram):
+                size = rng.randrange(1, 128)
+                yield telegram[pos : pos + size]
+                pos += size
+        else:
+            yield telegram
+
+    def delay(self, speedup: float, jitter: float) -> float:
+        """Return the wall clock time to wait before the next telegram."""
+        delay = self._interval / speedup
+        return max(0.0, delay + self._rng.uniform(-jitter, jitter) * delay)
+
+
+def run_pty(simulator: MeterSimulator, args: argparse.Namespace) -> None:
+    """Write telegrams to a fresh pseudo-terminal until stopped."""
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    port = os.ttyname(slave)
+    if args.link:
+        if os.path.islink(args.link):
+            os.unlink(args.link)
+        os.symlink(port, args.link)
+        port = args.link
+    LOGGER.info("Simulating meter on %s", port)
+
+    sent = 0
+    try:
+        while args.count is None or sent < args.count:
+            for chunk in simulator.chunks():
+                os.write(master, chunk.encode("utf-8"))
+                if args.split_delay:
+                    time.sleep(args.split_delay)
+            sent += 1
+            if sent % 100 == 0:
+                LOGGER.info("Sent %d telegrams", sent)
+            time.sleep(simulator.delay(args.speedup, args.jitter))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        LOGGER.info("Sent %d telegrams", sent)
+        if args.link and os.path.islink(args.link):
+            os.unlink(args.link)
+        os.close(master)
+        os.close(slave)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Parse the arguments and start the simulator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--key", default=DEFAULT_MBUS_KEY, help="MBUS key (hex)")
+    parser.add_argument("--system-title", default=DEFAULT_SYSTEM_TITLE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help="push interval of the meter in seconds",
+    )
+    parser.add_argument(
+        "--speedup", type=float, default=1.0, help="run faster than the real meter"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="relative jitter of the interval"
+    )
+    parser.add_argument("--count", type=int, default=None, help="stop after n telegrams")
+    parser.add_argument("--link", default=None, help="symlink pointing to the pty")
+    parser.add_argument(
+        "--split-delay",
+        type=float,
+        default=0.0,
+        help="seconds between the chunks of a split telegram",
+    )
+    parser.add_argument("--split", type=float, default=0.0, help="split read rate")
+    parser.add_argument("--garbage", type=float, default=0.0, help="garbage rate")
+    parser.add_argument("--truncate", type=float, default=0.0, help="truncation rate")
+    parser.add_argument("--wrong-key", type=float, default=0.0, help="wrong key rate")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    simulator = MeterSimulator(
+        mbus_key=args.key,
+        system_title=args.system_title,
+        interval=args.interval,
+        seed=args.seed,
+        faults=Faults(
+            split=args.split,
+            garbage=args.garbage,
+            truncate=args.truncate,
+            wrong_key=args.wrong_key,
+        ),
+    )
+    run_pty(simulator, args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,305 @@
+"""Long-run soak benchmark for Botastic Smartmeter.
+
+Pushes simulated telegrams through the read loop of BotasticSmartmeterApi
+(against a fake serial transport) or straight through MBusDecode and samples
+RSS, tracemalloc, GC counts and the net growth of allocated blocks over time.
+Exits with 1 when the memory growth exceeds the given budget.
+
+Needs the development requirements (``scripts/setup``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from functools import partial
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components"))
+
+from botastic_smartmeter import api, coordinator, mbus_decode  # noqa: E402
+from meter_simulator import Faults, MeterSimulator  # noqa: E402
+
+LOGGER = logging.getLogger("soak_benchmark")
+
+DEFAULT_FRAMES = 1_000_000
+DEFAULT_WARMUP = 10_000
+DEFAULT_SAMPLE = 10_000
+DEFAULT_POOL = 1_000
+DEFAULT_MAX_GROWTH_MB = 16.0
+DEFAULT_MAX_BYTES_PER_FRAME = 1.0
+
+
+def _rss() -> int:
+    """Return the resident set size of the process in bytes."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # No procfs, fall back to the peak
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class SoakMonitor:
+    """Samples the memory statistics every n frames."""
+
+    def __init__(self, frames: int, warmup: int, sample: int) -> None:
+        """Initialize the monitor."""
+        self.frames = 0
+        self._total = frames
+        self._warmup = warmup
+        self._sample = sample
+        self.done = asyncio.Event()
+        self.samples = []
+        self.baseline = None
+        self._last = self._snapshot()
+
+    def _snapshot(self) -> dict:
+        """Return the current statistics."""
+        traced, traced_peak = (
+            tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        )
+        return {
+            "frames": self.frames,
+            "time": time.perf_counter(),
+            "rss": _rss(),
+            "traced": traced,
+            "traced_peak": traced_peak,
+            "blocks": sys.getallocatedblocks(),
+            "collections": [stats["collections"] for stats in gc.get_stats()],
+        }
+
+    def frame(self) -> None:
+        """Count a decoded frame."""
+        self.frames += 1
+        if self.frames == self._warmup:
+            self.baseline = self._snapshot()
+        if self.frames % self._sample == 0 or self.frames == self._total:
+            self._add_sample()
+        if self.frames >= self._total:
+            self.done.set()
+
+    def _add_sample(self) -> None:
+        """Log the statistics of the last window."""
+        last = self._last
+        now = self._snapshot()
+        frames = now["frames"] - last["frames"]
+        LOGGER.info(
+            "%9d frames %7.1f us/frame rss %7.1f MB traced %8.1f kB "
+            "(peak %8.1f kB) net blocks/frame %+7.3f gc %s",
+            now["frames"],
+            (now["time"] - last["time"]) / frames * 1e6,
+            now["rss"] / 2**20,
+            now["traced"] / 2**10,
+            now["traced_peak"] / 2**10,
+            # Net change of sys.getallocatedblocks(), not the number of allocations
+            (now["blocks"] - last["blocks"]) / frames,
+            "/".join(str(count) for count in now["collections"]),
+        )
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self.samples.append(now)
+        self._last = now
+
+
+class SoakReader:
+    """Serial reader returning the pooled telegrams round robin."""
+
+    def __init__(self, chunks: list[bytes], monitor: SoakMonitor) -> None:
+        """Initialize the reader."""
+        self._chunks = chunks
+        self._monitor = monitor
+        self._pos = 0
+        self._frames = 0
+
+    async def read(self, size: int) -> bytes:
+        """Return the next chunk, block once all frames are sent."""
+        del size
+        if self._monitor.done.is_set():
+            await asyncio.Future()
+        # Let the loop run like on a real transport, else the cancelled
+        # read timeouts pile up in the scheduler
+        await asyncio.sleep(0)
+        chunk = self._chunks[self._pos]
+        self._pos = (self._pos + 1) % len(self._chunks)
+        if self._pos == 0:
+            if self._monitor.frames == self._frames:
+                LOGGER.error("No frame decoded, wrong MBUS key?")
+                self._monitor.done.set()
+            self._frames = self._monitor.frames
+        return chunk
+
+    async def close(self) -> None:
+        """Close the reader."""
+
+
+class SoakApi(api.BotasticSmartmeterApi):
+    """API client reading from the pooled telegrams."""
+
+    def __init__(self, hass: SimpleNamespace, reader: SoakReader, mbus_key: str) -> None:
+        """Initialize the API client without Home Assistant."""
+        self._soak_reader = reader
+        super().__init__(hass, "soak", mbus_key)
+
+    async def async_open_port(self) -> any:
+        """Open the fake port."""
+        return self._soak_reader, None
+
+
+class SoakCoordinator(coordinator.BotasticSmartmeterDataUpdateCoordinator):
+    """Coordinator counting the decoded frames."""
+
+    def __init__(
+        self, hass: SimpleNamespace, _api: SoakApi, monitor: SoakMonitor
+    ) -> None:
+        """Initialize the coordinator with a value listener per sensor."""
+        super().__init__(hass=hass, _api=_api)
+        self._monitor = monitor
+        self.values = {}
+        for key in _api.mbus_decode.octet_string_values.values():
+            self.async_add_value_listener(key, partial(self.values.__setitem__, key))
+
+    def async_set_updated_values(self, values: dict) -> None:
+        """Dispatch the values and count the frame."""
+        super().async_set_updated_values(values)
+        self._monitor.frame()
+
+
+def _pool(args: argparse.Namespace) -> list[str]:
+    """Generate the telegram chunks used round robin."""
+    simulator = MeterSimulator(
+        mbus_key=args.key,
+        seed=args.seed,
+        faults=Faults(split=args.split, garbage=args.garbage),
+    )
+    return [chunk for _ in range(args.pool) for chunk in simulator.chunks()]
+
+
+async def run_api(args: argparse.Namespace, monitor: SoakMonitor) -> None:
+    """Run the read loop until all frames are decoded."""
+    chunks = [chunk.encode("ascii") for chunk in _pool(args)]
+    hass = SimpleNamespace(
+        loop=asyncio.get_running_loop(),
+        bus=SimpleNamespace(async_listen_once=lambda *args: None),
+    )
+    _api = SoakApi(hass, SoakReader(chunks, monitor), args.key)
+    _api.coordinator = SoakCoordinator(hass, _api, monitor)
+    await monitor.done.wait()
+    # The read loop logs its cancellation as an exception
+    component_logger = logging.getLogger(api.__package__)
+    level = component_logger.level
+    component_logger.setLevel(logging.CRITICAL)
+    try:
+        _api.stop_serial_read(None)
+        await asyncio.gather(_api._serial_loop_task, return_exceptions=True)
+    finally:
+        component_logger.setLevel(level)
+
+
+async def run_decode(args: argparse.Namespace, monitor: SoakMonitor) -> None:
+    """Decode the pooled apdus until all frames are decoded."""
+    frame_parser = mbus_decode.MBusFrameParser()
+    apdus = [apdu for chunk in _pool(args) for apdu in frame_parser.feed(chunk)]
+    decoder = mbus_decode.MBusDecode(args.key)
+    while not monitor.done.is_set():
+        decoded = 0
+        for apdu in apdus:
+            if decoder.dlms_decode(apdu, False) is not None:
+                decoded += 1
+                monitor.frame()
+                if monitor.done.is_set():
+                    break
+        if not decoded:
+            LOGGER.error("No frame decoded, wrong MBUS key?")
+            return
+
+
+async def run(args: argparse.Namespace) -> SoakMonitor:
+    """Run the selected target and return the collected samples."""
+    monitor = SoakMonitor(args.frames, args.warmup, args.sample)
+    if args.target == "api":
+        await run_api(args, monitor)
+    else:
+        await run_decode(args, monitor)
+    return monitor
+
+
+def check_budget(args: argparse.Namespace, monitor: SoakMonitor) -> bool:
+    """Return if the memory growth after the warmup is within the budget."""
+    if monitor.baseline is None or not monitor.samples:
+        LOGGER.error("Not enough frames for the warmup of %d frames", args.warmup)
+        return False
+    baseline = monitor.baseline
+    end = monitor.samples[-1]
+    frames = end["frames"] - baseline["frames"]
+    growth = end["rss"] - baseline["rss"]
+    key = "traced" if args.tracemalloc else "rss"
+    per_frame = (end[key] - baseline[key]) / max(frames, 1)
+    LOGGER.info(
+        "%d frames after warmup: rss growth %.1f MB, %s growth %.3f bytes/frame, "
+        "%+.4f net blocks/frame",
+        frames,
+        growth / 2**20,
+        key,
+        per_frame,
+        (end["blocks"] - baseline["blocks"]) / max(frames, 1),
+    )
+    result = True
+    if growth > args.max_growth_mb * 2**20:
+        LOGGER.error("RSS grew by more than %.1f MB", args.max_growth_mb)
+        result = False
+    if per_frame > args.max_bytes_per_frame:
+        LOGGER.error(
+            "Memory grew by more than %.3f bytes/frame", args.max_bytes_per_frame
+        )
+        result = False
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Parse the arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", choices=("api", "decode"), default="api")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument(
+        "--sample", type=int, default=DEFAULT_SAMPLE, help="frames per sample"
+    )
+    parser.add_argument(
+        "--pool", type=int, default=DEFAULT_POOL, help="distinct telegrams"
+    )
+    parser.add_argument("--key", default="0123456789ABCDEF0123456789ABCDEF")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--split", type=float, default=0.0, help="split read rate")
+    parser.add_argument("--garbage", type=float, default=0.0, help="garbage rate")
+    parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="trace python allocations (slow, but exact per frame growth)",
+    )
+    parser.add_argument(
+        "--max-growth-mb", type=float, default=DEFAULT_MAX_GROWTH_MB
+    )
+    parser.add_argument(
+        "--max-bytes-per-frame", type=float, default=DEFAULT_MAX_BYTES_PER_FRAME
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    monitor = asyncio.run(run(args))
+    return 0 if check_budget(args, monitor) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
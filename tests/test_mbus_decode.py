@@ -0,0 +1,100 @@
+"""Tests for the M-Bus frame parser and the DLMS decoder."""
+
+import pytest
+
+from custom_components.botastic_smartmeter import mbus_decode
+from custom_components.botastic_smartmeter.api import SIM_DATA
+from custom_components.botastic_smartmeter.const import CONF_MBUS_KEY_DEFAULT
+
+# SIM_DATA holds two long frames: 256 bytes (CI 00) and 26 bytes (CI 11)
+FIRST_SEGMENT = SIM_DATA[:512]
+SECOND_SEGMENT = SIM_DATA[512:]
+SIM_APDU = bytes.fromhex(FIRST_SEGMENT[18:-4] + SECOND_SEGMENT[18:-4])
+
+
+def _frame(ci, data=b""):
+    """Return a long frame with the given CI field as hex text."""
+    body = bytes([0x53, 0xFF, ci, 0x01, 0x67]) + data
+    frame = bytes([0x68, len(body), len(body), 0x68]) + body
+    return (frame + bytes([sum(body) & 0xFF, 0x16])).hex().upper()
+
+
+def test_sim_data_reassembly():
+    """Both segments of SIM_DATA give one apdu."""
+    apdus = mbus_decode.MBusFrameParser().feed(SIM_DATA)
+    assert apdus == [SIM_APDU]
+    assert len(apdus[0]) == 260
+    assert apdus[0][0] == mbus_decode.DLMS_GENERAL_GLO_CIPHERING
+
+
+def test_feed_nibble_by_nibble():
+    """Frames split at any position are reassembled."""
+    frame_parser = mbus_decode.MBusFrameParser()
+    apdus = []
+    for char in SIM_DATA:
+        apdus += frame_parser.feed(char)
+    assert apdus == [SIM_APDU]
+
+
+@pytest.mark.parametrize(
+    "data",
+    ["680000680016", "68010168000016", "6802026800000016", "680303685300FF5216"],
+)
+def test_short_frames(data):
+    """Frames too short for the transport header are ignored."""
+    frame_parser = mbus_decode.MBusFrameParser()
+    assert frame_parser.feed(data) == []
+    assert frame_parser.feed(SIM_DATA) == [SIM_APDU]
+
+
+def test_garbage_and_resync():
+    """Garbage, odd nibbles and truncated frames are skipped."""
+    frame_parser = mbus_decode.MBusFrameParser()
+    data = "XYZ\r\n6" + "68FA12" + SIM_DATA[:300] + "A" + SIM_DATA + "\r\n"
+    assert frame_parser.feed(data) == [SIM_APDU]
+    assert frame_parser.feed(SIM_DATA) == [SIM_APDU]
+
+
+def test_bad_checksum():
+    """A frame with a wrong checksum is dropped."""
+    data = SIM_DATA[:-4] + "0016"
+    assert mbus_decode.MBusFrameParser().feed(data) == []
+
+
+def test_out_of_sequence_segments():
+    """Segments without their predecessor are dropped."""
+    frame_parser = mbus_decode.MBusFrameParser()
+    assert frame_parser.feed(SECOND_SEGMENT) == []
+    assert frame_parser.feed(_frame(0x00, b"\x01") + _frame(0x12, b"\x03")) == []
+    assert frame_parser.feed(_frame(0x11, b"\x02")) == []
+    assert frame_parser.feed(_frame(0x00, b"\x01") + _frame(0x11, b"\x02")) == [
+        b"\x01\x02"
+    ]
+
+
+def test_single_segment():
+    """A single final segment is a complete apdu."""
+    assert mbus_decode.MBusFrameParser().feed(_frame(0x10, b"\x0f\x80")) == [
+        b"\x0f\x80"
+    ]
+
+
+def test_non_dlms_ci_field():
+    """Frames with other CI fields are ignored."""
+    assert mbus_decode.MBusFrameParser().feed(_frame(0x72, b"\x01")) == []
+
+
+@pytest.mark.parametrize(
+    "apdu",
+    [
+        "DB",
+        "DB20",
+        "DB080000000000000000",
+        "DB0800000000000000008201",
+        "DB08000000000000000081F820",
+    ],
+)
+def test_truncated_security_header(apdu):
+    """Truncated ciphered apdus are not decoded."""
+    decoder = mbus_decode.MBusDecode(CONF_MBUS_KEY_DEFAULT)
+    assert decoder.dlms_decode(bytes.fromhex(apdu)) is None